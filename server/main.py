@@ -17,56 +17,178 @@ import asyncio
 import logging
 import os
 import random
-import sys
+import re
 import time
-import traceback
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
-from typing import Annotated, List, Sequence
+from email.utils import parsedate_to_datetime
+from typing import Annotated, Awaitable, Callable, List, Sequence
 
 import httpx
+import orjson
 from fastmcp import FastMCP
 from fastmcp.server.dependencies import get_http_headers
 from fastmcp.server.middleware import Middleware, MiddlewareContext
 from pydantic import BaseModel, Field
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 
-TOMTOM_API_KEY = os.environ.get("TOMTOM_API_KEY")
-OPENAQ_API_KEY = os.environ.get("OPENAQ_API_KEY")
 TOMTOM_API_ENDPOINT = "https://api.tomtom.com"
 OPENAQ_ENDPOINT = "https://api.openaq.org"
 DEGREE_RANGE = 3.0
+# minimum spacing between TomTom dispatches in a batch (~5.5 req/s)
+TOMTOM_MIN_INTERVAL = 0.180
+# concurrent lookups in a batch
+GEOCODE_BATCH_WORKERS = 2
+# connect/read/write/pool timeout for each TomTom geocode request
+GEOCODE_TIMEOUT = httpx.Timeout(3.0)
+# upstream responses worth retrying, with exponential backoff
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRY_MAX_WAIT = 4.0
+GEOCODE_CACHE_TTL = 24 * 60 * 60
+GEOCODE_CACHE_MAX_ENTRIES = 10000
+# sensor locations near a point change rarely; readings are fetched fresh
+LOCATIONS_CACHE_TTL = 30 * 60
+LOCATIONS_CACHE_MAX_ENTRIES = 1000
+
+# Shared upstream clients, created once at server startup so that every tool
+# invocation reuses the same connection pool (and TLS sessions).
+_tomtom_client: httpx.AsyncClient | None = None
+_openaq_client: httpx.AsyncClient | None = None
+
+
+def _load_config() -> tuple[str, str]:
+    """Returns the (TomTom, OpenAQ) API keys from the environment, stripped."""
+    tomtom_api_key = os.environ.get("TOMTOM_API_KEY", "").strip()
+    openaq_api_key = os.environ.get("OPENAQ_API_KEY", "").strip()
+    if not tomtom_api_key or not openaq_api_key:
+        raise RuntimeError("missing environment variables")
+    return tomtom_api_key, openaq_api_key
+
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP):
+    global _tomtom_client, _openaq_client
+    tomtom_api_key, openaq_api_key = _load_config()
+    # Both upstreams speak HTTP/2, so concurrent calls multiplex over one
+    # connection. max_connections is also the per-host ceiling.
+    limits = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+    # Tight timeouts so that one slow upstream call doesn't stall a batch;
+    # a timed-out call is retried by _get_json.
+    timeout = httpx.Timeout(connect=2.0, read=4.0, write=2.0, pool=1.0)
+    _tomtom_client = httpx.AsyncClient(
+        base_url=TOMTOM_API_ENDPOINT,
+        params={"key": tomtom_api_key},
+        http2=True,
+        limits=limits,
+        timeout=timeout,
+    )
+    _openaq_client = httpx.AsyncClient(
+        base_url=OPENAQ_ENDPOINT,
+        headers={"X-API-KEY": openaq_api_key},
+        http2=True,
+        limits=limits,
+        timeout=timeout,
+    )
+    try:
+        yield
+    finally:
+        await _tomtom_client.aclose()
+        await _openaq_client.aclose()
+
 
-mcp = FastMCP()
+mcp = FastMCP(lifespan=_lifespan)
 
 
 class UserInfoMiddleware(Middleware):
     async def on_call_tool(self, context: MiddlewareContext, call_next):
-        # Access the tool object to check its metadata
-        if context.fastmcp_context:
-            try:
-                tool = await context.fastmcp_context.fastmcp.get_tool(
-                    context.message.name
-                )
-                headers = get_http_headers()
-                user_info = headers.get("user-info")
-                # Check that the user_info variable is not None here
-                if user_info is not None:
-                    logging.info(f"tool={tool.name}; {user_info}")
-                else:
-                    logging.info("user_info is unavailable")
-                # Here, could check user_info scope, against the tags
-                # on the tool, if desired.
-
-            except Exception:
-                # Tool not found or other error - let execution continue
-                # and handle the error naturally
-                pass
+        # Skip reading the headers entirely when the log line would be dropped.
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            user_info = get_http_headers().get("user-info")
+            if user_info is not None:
+                logging.info("tool=%s; %s", context.message.name, user_info)
+            else:
+                logging.info("user_info is unavailable")
+        # Here, could check user_info scope, against the tags
+        # on the tool, if desired.
 
-            return await call_next(context)
+        return await call_next(context)
 
 
 mcp.add_middleware(UserInfoMiddleware())
 
 
+def _retry_after(response: httpx.Response) -> float | None:
+    """Returns the Retry-After delay in seconds, if the response has one."""
+    value = response.headers.get("retry-after", "").strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _is_transient(e: BaseException) -> bool:
+    if isinstance(e, httpx.TransportError):
+        return True
+    if not (
+        isinstance(e, httpx.HTTPStatusError)
+        and e.response.status_code in TRANSIENT_STATUS_CODES
+    ):
+        return False
+    # If the server wants us to back off longer than we are willing to wait,
+    # a retry would just spend quota on another likely 429; give up now.
+    retry_after = _retry_after(e.response)
+    return retry_after is None or retry_after <= RETRY_MAX_WAIT
+
+
+_backoff = wait_exponential_jitter(initial=0.25, max=RETRY_MAX_WAIT)
+
+
+def _wait_for_retry(retry_state) -> float:
+    """Exponential backoff with jitter, stretched to honor Retry-After."""
+    delay = _backoff(retry_state)
+    e = retry_state.outcome.exception()
+    if isinstance(e, httpx.HTTPStatusError):
+        retry_after = _retry_after(e.response)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+    return delay
+
+
+@retry(
+    retry=retry_if_exception(_is_transient),
+    stop=stop_after_attempt(4),
+    wait=_wait_for_retry,
+    reraise=True,
+)
+async def _get_json(
+    client: httpx.AsyncClient,
+    path: str,
+    pace: Callable[[], Awaitable[None]] | None = None,
+    **kwargs,
+) -> dict:
+    """GET an upstream path and return the parsed body, retrying on 429/5xx.
+
+    pace(), if given, is awaited before every attempt, so that retries take a
+    rate-limit slot just like first attempts.
+    """
+    if pace is not None:
+        await pace()
+    response = await client.get(path, **kwargs)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
 class AirQualityResult(BaseModel):
     """Air quality reading result"""
 
@@ -98,6 +220,19 @@ class AirQualityResult(BaseModel):
     ]
 
 
+# Error results are built from this template with model_copy, rather than
+# validating a fresh model each time.
+_ERROR_AIR_RESULT = AirQualityResult(
+    sensor_id=0, placename="", timestamp="", pm25=-1.0, status=""
+)
+# Constant result for when no locations are near the coordinates; do not mutate.
+_EMPTY_AIR_RESULT = [
+    _ERROR_AIR_RESULT.model_copy(
+        update={"status": "Error. No locations found near coordinates."}
+    )
+]
+
+
 class GeocodePlacenameResponse(BaseModel):
     """Response for the placename-to-latlon tool."""
 
@@ -125,18 +260,92 @@ class GeocodePlacenameResponse(BaseModel):
     ]
 
 
+def _cache_get(cache: OrderedDict, key, ttl: float):
+    """Returns the cached value for key, or None if absent or older than ttl."""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    ts, value = entry
+    if time.monotonic() - ts >= ttl:
+        del cache[key]
+        return None
+    cache.move_to_end(key)
+    return value
+
+
+def _cache_put(cache: OrderedDict, key, value, max_entries: int) -> None:
+    cache[key] = (time.monotonic(), value)
+    cache.move_to_end(key)
+    while len(cache) > max_entries:
+        cache.popitem(last=False)
+
+
+# A placename that is already a "lat,lon" pair, e.g. from a previous result.
+_LATLON_RE = re.compile(r"^\s*(-?\d{1,2}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)\s*$")
+
+# LRU cache of successful geocode results, keyed by normalized placename.
+# Values are (time.monotonic() at insertion, response).
+_GEOCODE_CACHE: OrderedDict[str, tuple[float, GeocodePlacenameResponse]] = OrderedDict()
+# One lock per in-flight placename, so that concurrent lookups for the same
+# name result in a single upstream call.
+_GEOCODE_LOCKS: dict[str, asyncio.Lock] = {}
+
+# LRU cache of OpenAQ /v3/locations results, keyed by (lat, lon) rounded to
+# ~1km. Values are (time.monotonic() at insertion, list of locations).
+_LOCATIONS_CACHE: OrderedDict[tuple[float, float], tuple[float, list]] = OrderedDict()
+_LOCATIONS_LOCKS: dict[tuple[float, float], asyncio.Lock] = {}
+
+
 async def _geocode_one_placename(
-    placename: str, client: httpx.AsyncClient
+    placename: str,
+    client: httpx.AsyncClient,
+    pace: Callable[[], Awaitable[None]] | None = None,
+) -> GeocodePlacenameResponse:
+    """Resolves one placename. If given, pace() is awaited just before a
+    request actually goes to TomTom; pass-throughs and cache hits skip it."""
+    m = _LATLON_RE.match(placename)
+    if m:
+        latitude, longitude = float(m[1]), float(m[2])
+        if abs(latitude) <= 90 and abs(longitude) <= 180:
+            return GeocodePlacenameResponse.model_construct(
+                latitude=latitude,
+                longitude=longitude,
+                message="ok (pass-through)",
+                placename=placename,
+            )
+
+    key = placename.strip().casefold()
+    cached = _cache_get(_GEOCODE_CACHE, key, GEOCODE_CACHE_TTL)
+    if cached is None:
+        lock = _GEOCODE_LOCKS.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # another caller may have filled the cache while we waited
+                cached = _cache_get(_GEOCODE_CACHE, key, GEOCODE_CACHE_TTL)
+                if cached is None:
+                    response = await _fetch_geocode(placename, client, pace)
+                    if response.message != "ok":
+                        return response
+                    _cache_put(_GEOCODE_CACHE, key, response, GEOCODE_CACHE_MAX_ENTRIES)
+                    return response
+        finally:
+            if _GEOCODE_LOCKS.get(key) is lock:
+                del _GEOCODE_LOCKS[key]
+
+    if cached.placename == placename:
+        return cached
+    return cached.model_copy(update={"placename": placename})
+
+
+async def _fetch_geocode(
+    placename: str,
+    client: httpx.AsyncClient,
+    pace: Callable[[], Awaitable[None]] | None = None,
 ) -> GeocodePlacenameResponse:
     try:
         path = f"/search/2/geocode/{placename}.json"
         logging.info("GET %s", path)
-        response = await client.get(
-            f"{TOMTOM_API_ENDPOINT}{path}",
-            params={"key": TOMTOM_API_KEY},
-        )
-        response.raise_for_status()
-        data = response.json()
+        data = await _get_json(client, path, pace=pace, timeout=GEOCODE_TIMEOUT)
 
         results = data.get("results")
         if not results:
@@ -148,9 +357,10 @@ async def _geocode_one_placename(
             )
 
         position = results[0]["position"]
-        return GeocodePlacenameResponse(
-            latitude=position["lat"],
-            longitude=position["lon"],
+        # fields are already the right types; skip pydantic validation
+        return GeocodePlacenameResponse.model_construct(
+            latitude=float(position["lat"]),
+            longitude=float(position["lon"]),
             message="ok",
             placename=placename,
         )
@@ -161,6 +371,13 @@ async def _geocode_one_placename(
             placename=placename,
             message=f"upstream error (status code={e.response.status_code})",
         )
+    except httpx.HTTPError as e:
+        return GeocodePlacenameResponse(
+            latitude=0.0,
+            longitude=0.0,
+            placename=placename,
+            message=f"transport error: {type(e).__name__}",
+        )
 
 
 @mcp.tool(
@@ -176,8 +393,7 @@ async def placename_to_latlon(
     """
     This description is ignored for the purposes of MCP, if a description is provided in the decorator above.
     """
-    async with httpx.AsyncClient() as client:
-        return await _geocode_one_placename(placename, client)
+    return await _geocode_one_placename(placename, _tomtom_client)
 
 
 @mcp.tool(
@@ -194,26 +410,138 @@ async def placenames_to_latlons(
     """
     ignored. See description above.
     """
-    async with httpx.AsyncClient() as client:
-        semaphore = asyncio.Semaphore(2)
-        rate_limit_lock = asyncio.Lock()
-        # Initialize to allow the first call to proceed without delay.
-        last_call_time = time.monotonic() - 0.180
+    # Each TomTom dispatch reserves the next free slot, spaced
+    # TOMTOM_MIN_INTERVAL apart, then sleeps until that slot arrives. There is
+    # no await between reading and bumping next_slot, so the reservation is
+    # atomic on the event loop and needs no lock. Lookups that never reach
+    # TomTom (pass-throughs, cache hits) don't call this, so cost no slot.
+    next_slot = time.monotonic()
+
+    async def _pace() -> None:
+        nonlocal next_slot
+        now = time.monotonic()
+        slot = max(now, next_slot)
+        next_slot = slot + TOMTOM_MIN_INTERVAL
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    # A fixed pool of workers drains the queue, so only a few lookups are
+    # outstanding at any time regardless of the batch size.
+    queue: asyncio.Queue[tuple[int, str]] = asyncio.Queue()
+    for item in enumerate(placenames):
+        queue.put_nowait(item)
+    results: List[GeocodePlacenameResponse | None] = [None] * len(placenames)
+
+    async def _worker() -> None:
+        while True:
+            try:
+                i, placename = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                results[i] = await _geocode_one_placename(
+                    placename, _tomtom_client, pace=_pace
+                )
+            except Exception:
+                # leave results[i] unset; it is reported as an error below
+                logging.exception("placenames_to_latlons failed for %r", placename)
+
+    # Lookup failures are contained in the workers, so the task group only
+    # ever cancels them on cancellation of the tool call itself.
+    async with asyncio.TaskGroup() as tg:
+        for _ in range(GEOCODE_BATCH_WORKERS):
+            tg.create_task(_worker())
+
+    return [
+        (
+            result
+            if result is not None
+            else GeocodePlacenameResponse(
+                latitude=0.0,
+                longitude=0.0,
+                placename=placename,
+                message="error resolving placename",
+            )
+        )
+        for placename, result in zip(placenames, results)
+    ]
 
-        async def _get_one_semaphored(placename: str) -> GeocodePlacenameResponse:
-            nonlocal last_call_time
-            async with semaphore:
-                async with rate_limit_lock:
-                    now = time.monotonic()
-                    if now < last_call_time + 0.180:
-                        await asyncio.sleep(last_call_time + 0.180 - now)
-                    last_call_time = time.monotonic()
 
-                return await _geocode_one_placename(placename, client)
+async def _fetch_sensor_reading(
+    location: dict, pm25_sensor: dict, from_datetime: str, client: httpx.AsyncClient
+) -> AirQualityResult | None:
+    """Returns the most recent reading for a location's pm25 sensor, or None."""
+    sensor_id = pm25_sensor["id"]
+
+    try:
+        path = f"/v3/sensors/{sensor_id}/measurements/hourly"
+        logging.info("get_air_quality GET %s", path)
+        data = await _get_json(client, path, params={"datetime_from": from_datetime})
+    except httpx.HTTPStatusError as e:
+        logging.info(
+            "upstream error for sensor %s (status code=%d)",
+            sensor_id,
+            e.response.status_code,
+        )
+        return None
+    results = data.get("results")
+
+    if not results:
+        logging.info("get_air_quality no readings for sensor %s", sensor_id)
+        return None
+
+    for measurement in reversed(results):
+        if (
+            measurement.get("period", {}).get("datetimeTo", {}).get("utc") is not None
+            and measurement.get("value") is not None
+        ):
+            # fields are already the right types; skip pydantic validation
+            return AirQualityResult.model_construct(
+                sensor_id=sensor_id,
+                placename=location["name"],
+                timestamp=measurement["period"]["datetimeTo"]["utc"],
+                pm25=float(measurement["value"]),
+                status="Success.",
+            )
+    return None
+
 
-        tasks = [_get_one_semaphored(placename) for placename in placenames]
-        results = await asyncio.gather(*tasks)
-        return list(results)
+async def _fetch_locations(
+    latitude: float, longitude: float, client: httpx.AsyncClient
+) -> list:
+    """Returns the OpenAQ locations near a point, cached per ~1km bucket."""
+    key = (round(latitude, 2), round(longitude, 2))
+    cached = _cache_get(_LOCATIONS_CACHE, key, LOCATIONS_CACHE_TTL)
+    if cached is not None:
+        return cached
+
+    lock = _LOCATIONS_LOCKS.setdefault(key, asyncio.Lock())
+    try:
+        async with lock:
+            # another caller may have filled the cache while we waited
+            cached = _cache_get(_LOCATIONS_CACHE, key, LOCATIONS_CACHE_TTL)
+            if cached is not None:
+                return cached
+
+            path = "/v3/locations"
+            logging.info("get_air_quality GET %s", path)
+            # query the bucket, not the exact point, so that every caller
+            # sharing a cache entry would have seen the same results
+            data = await _get_json(
+                client,
+                path,
+                params={
+                    "coordinates": f"{key[0]},{key[1]}",
+                    "radius": 12000,
+                    "limit": 25,
+                },
+            )
+            results = data.get("results") or []
+            _cache_put(_LOCATIONS_CACHE, key, results, LOCATIONS_CACHE_MAX_ENTRIES)
+            return results
+    finally:
+        if _LOCATIONS_LOCKS.get(key) is lock:
+            del _LOCATIONS_LOCKS[key]
 
 
 @mcp.tool(
@@ -233,177 +561,78 @@ async def get_air_quality(
 ) -> Sequence[AirQualityResult]:
     """See above"""
 
-    async with httpx.AsyncClient() as client:
-        try:
-            path = "/v3/locations"
-            logging.info("get_air_quality GET %s", path)
-            response = await client.get(
-                f"{OPENAQ_ENDPOINT}{path}",
-                params={
-                    "coordinates": f"{latitude},{longitude}",
-                    "radius": 12000,
-                    "limit": 25,
-                },
-                headers={"X-API-KEY": OPENAQ_API_KEY},
-            )
-            logging.info("get_air_quality response1")
-            response.raise_for_status()
-            data = response.json()
-
-            results = data.get("results")
-            logging.info("get_air_quality results1")
-
-            if not results:
-                logging.info("get_air_quality no results")
-                return [
-                    AirQualityResult(
-                        sensor_id=0,
-                        placename="",
-                        timestamp="",
-                        pm25=-1,
-                        status="Error. No locations found near coordinates.",
-                    )
-                ]
-
-            eight_hours_ago = datetime.now(timezone.utc) - timedelta(hours=8)
-            logging.info("get_air_quality looking for suitable locations")
-
-            suitable_locations = []
-            for loc in results:
-                # json_string = json.dumps(loc)
-                # logging.info(f"get_air_quality looking at loc {json_string}")
-
-                last_updated_str = (loc.get("datetimeLast") or {}).get("utc")
-                if not last_updated_str:
-                    continue
-                last_updated = datetime.fromisoformat(
-                    last_updated_str.replace("Z", "+00:00")
-                )
-                if last_updated < eight_hours_ago:
-                    continue
-
-                sensors = loc.get("sensors", [])
-                has_pm25 = any(
-                    s.get("parameter", {}).get("name") == "pm25" for s in sensors
-                )
-                if has_pm25:
-                    suitable_locations.append(loc)
+    client = _openaq_client
+    try:
+        results = await _fetch_locations(latitude, longitude, client)
 
-            if not suitable_locations:
-                logging.info("get_air_quality no suitable locations")
-                return []
+        if not results:
+            logging.info("get_air_quality no results")
+            return _EMPTY_AIR_RESULT
+
+        # OpenAQ reports UTC timestamps as ISO-8601 strings, which compare
+        # lexicographically in time order; no need to parse each one.
+        eight_hours_ago = datetime.now(timezone.utc) - timedelta(hours=8)
+        from_datetime = eight_hours_ago.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        # (location, pm25 sensor) pairs
+        suitable_locations = []
+        for loc in results:
+            last_updated_str = (loc.get("datetimeLast") or {}).get("utc")
+            if not last_updated_str or last_updated_str < from_datetime:
+                continue
+
+            for sensor in loc.get("sensors", []):
+                if sensor.get("parameter", {}).get("name") == "pm25":
+                    suitable_locations.append((loc, sensor))
+                    break
 
-            logging.info(
-                f"get_air_quality found ({len(suitable_locations)}) suitable locations"
-            )
+        if not suitable_locations:
+            logging.info("get_air_quality no suitable locations")
+            return []
 
-            random.shuffle(suitable_locations)
-            air_quality_results = []
-            for selected_location in suitable_locations:
-                if len(air_quality_results) >= 3:
-                    break
+        logging.info(
+            "get_air_quality found (%d) suitable locations", len(suitable_locations)
+        )
 
-                logging.info("get_air_quality looking for sensors")
-                pm25_sensor = next(
-                    (
-                        s
-                        for s in selected_location["sensors"]
-                        if s.get("parameter", {}).get("name") == "pm25"
-                    ),
-                    None,
-                )
+        # Query more sensors than needed, in parallel, because some of them
+        # will have no recent readings. Keep the first 3 that succeed.
+        candidates = random.sample(
+            suitable_locations, k=min(6, len(suitable_locations))
+        )
+        fetched = await asyncio.gather(
+            *[
+                _fetch_sensor_reading(loc, sensor, from_datetime, client)
+                for loc, sensor in candidates
+            ],
+            return_exceptions=True,
+        )
+        air_quality_results = []
+        for result in fetched:
+            if isinstance(result, BaseException):
+                logging.info("get_air_quality sensor fetch failed: %r", result)
+            elif result is not None:
+                air_quality_results.append(result)
+        return air_quality_results[:3]
 
-                if not pm25_sensor:
-                    logging.info("get_air_quality no pm25 sensor")
-                    continue
-
-                logging.info("get_air_quality found pm25 sensor")
-                sensor_id = pm25_sensor["id"]
-                from_datetime = eight_hours_ago.isoformat().replace("+00:00", "Z")
-
-                try:
-                    path = f"/v3/sensors/{sensor_id}/measurements/hourly"
-                    logging.info("get_air_quality GET %s", path)
-                    response = await client.get(
-                        f"{OPENAQ_ENDPOINT}{path}",
-                        params={"datetime_from": from_datetime},
-                        headers={"X-API-KEY": OPENAQ_API_KEY},
-                    )
-                    response.raise_for_status()
-                    data = response.json()
-                except httpx.HTTPStatusError as e:
-                    logging.info(
-                        f"upstream error for sensor {sensor_id} (status code={e.response.status_code})"
-                    )
-                    continue
-                results = data.get("results")
-
-                if not results:
-                    logging.info("get_air_quality no sensor readings")
-                    continue
-
-                logging.info("get_air_quality getting most recent sensor reading")
-
-                last_measurement = None
-                for measurement in reversed(results):
-                    if (
-                        measurement.get("period", {}).get("datetimeTo", {}).get("utc")
-                        is not None
-                        and measurement.get("value") is not None
-                    ):
-                        last_measurement = measurement
-                        break
-
-                if last_measurement:
-                    air_quality_results.append(
-                        AirQualityResult(
-                            sensor_id=sensor_id,
-                            placename=selected_location["name"],
-                            timestamp=last_measurement["period"]["datetimeTo"]["utc"],
-                            pm25=last_measurement["value"],
-                            status="Success.",
-                        )
-                    )
-            return air_quality_results
-
-        except httpx.HTTPStatusError as e:
-            logging.info(f"upstream error (status code={e.response.status_code})")
-            return [
-                AirQualityResult(
-                    sensor_id=0,
-                    placename="",
-                    timestamp="",
-                    pm25=-1,
-                    status=f"API error: {e.response.status_code}",
-                )
-            ]
-        except Exception:
-            exc_type, exc_value, exc_traceback = sys.exc_info()
-            line_number = traceback.extract_tb(exc_traceback)[-1].lineno
-            logging.info(
-                f"get_air_quality some other exception at line {line_number}: {exc_value}"
+    except httpx.HTTPStatusError as e:
+        logging.info("upstream error (status code=%d)", e.response.status_code)
+        return [
+            _ERROR_AIR_RESULT.model_copy(
+                update={"status": f"API error: {e.response.status_code}"}
             )
-            return [
-                AirQualityResult(
-                    sensor_id=0,
-                    placename="",
-                    timestamp="",
-                    pm25=-1,
-                    status=f"An unexpected error occurred at line {line_number}: {exc_value}",
-                )
-            ]
+        ]
+    except (httpx.HTTPError, KeyError, ValueError) as e:
+        logging.exception("get_air_quality failed")
+        return [
+            _ERROR_AIR_RESULT.model_copy(
+                update={"status": f"unexpected error: {type(e).__name__}"}
+            )
+        ]
 
 
 if __name__ == "__main__":
     LOGLEVEL = os.environ.get("LOGLEVEL", "INFO").upper()
     logging.basicConfig(level=LOGLEVEL)
-    if not TOMTOM_API_KEY or not OPENAQ_API_KEY:
-        logging.info("missing environment variables")
-        raise SystemExit
-
-    TOMTOM_API_KEY = TOMTOM_API_KEY.strip()
-    OPENAQ_API_KEY = OPENAQ_API_KEY.strip()
-
     port = int(os.environ.get("PORT", 9247))
     mcp.run(
         transport="http", host="0.0.0.0", port=port, path="/mcp", stateless_http=True